@@ -6,9 +6,16 @@ from src.github_utils import get_input, set_failed, info
 from src.pa_client import PythonAnywhereClient
 from src.pa_utils import PythonAnywhereUtils
 from src.frameworks import FrameworkFactory
+from src.deadline import Deadline, DeadlineExceeded
+from src.transport import create_transport
+from src.async_pa_client import AsyncPythonAnywhereClient
+from src.orchestrator import DeployOrchestrator
+from src.metadata_cache import MetadataCache
 
 def run():
     """Main entry point for the action execution."""
+    cache = None
+    deployed = False
     try:
         # 1. Get Inputs
         username = get_input("username", required=True)
@@ -17,88 +24,147 @@ def run():
         domain_name = get_input("domain_name", required=False)
         framework_type = get_input("framework_type", required=False, default="django")
         django_settings = get_input("django_settings", required=False)
+        framework_file = get_input("framework_file", required=False)
         envs_string = get_input("envs", required=False)
+        deploy_timeout = get_input("deploy_timeout", required=False)
+        phase_timeouts = get_input("phase_timeouts", required=False)
+        http_backend = get_input("http_backend", required=False) or "stdlib"
+        reload_domains = get_input("reload_domains", required=False)
+        warm_up = get_input("warm_up", required=False, default="false").lower() == "true"
+        always_on_tasks = get_input("always_on_tasks", required=False)
+        cache_file = get_input("cache_file", required=False)
+        cache_ttl = get_input("cache_ttl", required=False, default="86400")
 
-        client = PythonAnywhereClient(username, api_token, host)
+        if framework_file:
+            framework_type = FrameworkFactory.load_definition(framework_file)
+
+        ttl = MetadataCache.parse_ttl(cache_ttl)
+        deadline = Deadline(
+            Deadline.parse_total(deploy_timeout),
+            Deadline.parse_phase_budgets(phase_timeouts)
+        )
+        client = PythonAnywhereClient(
+            username, api_token, host,
+            deadline=deadline,
+            transport=create_transport(http_backend)
+        )
+        if cache_file:
+            cache = MetadataCache(cache_file, ttl=ttl, key=f"{host}/{username}")
 
         # 2. Setup Console and WebApp
-        _console = PythonAnywhereUtils.setup_console(client)
-        console_id = _console["id"]
-        web_app = PythonAnywhereUtils.setup_web_app(client, domain_name)
-        
+        with deadline.phase("setup"):
+            _console = PythonAnywhereUtils.setup_console(client, cache)
+            web_app = PythonAnywhereUtils.setup_web_app(client, domain_name, cache)
+
         # 3. Upload .env file if envs are provided
         if envs_string:
+            with deadline.phase("envs"):
+                try:
+                    envs_dict = {}
+                    for line in envs_string.splitlines():
+                        line = line.strip()
+                        if not line or line.startswith('#'):
+                            continue
+                        if '=' in line:
+                            key, value = line.split('=', 1)
+                            envs_dict[key.strip()] = value.strip()
+
+                    if envs_dict:
+                        _console = PythonAnywhereUtils.run_on_console(
+                            client,
+                            _console,
+                            lambda console_id: PythonAnywhereUtils.upload_env_file(client, console_id, web_app, envs_dict),
+                            cache
+                        )
+                    else:
+                        info("Input 'envs' provided, but no valid KEY=VALUE pairs found. Skipping .env file upload.")
+
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    set_failed(f"Error processing 'envs' input: {e}")
+
+        # 4. Git Pull
+        with deadline.phase("git_pull"):
             try:
-                envs_dict = {}
-                for line in envs_string.splitlines():
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        envs_dict[key.strip()] = value.strip()
-                
-                if envs_dict:
-                    PythonAnywhereUtils.upload_env_file(client, console_id, web_app, envs_dict)
-                else:
-                    info("Input 'envs' provided, but no valid KEY=VALUE pairs found. Skipping .env file upload.")
+                _console = PythonAnywhereUtils.run_on_console(
+                    client,
+                    _console,
+                    lambda console_id: client.send_input_to_console(
+                        console_id,
+                        f"git -C {web_app['source_directory']} pull",
+                        "Checking repository status..."
+                    ),
+                    cache
+                )
+
+                pull_response = client.get_latest_console_output(
+                    _console["id"],
+                    "Git Pull completed."
+                )
+
+                pull_success, pull_error = PythonAnywhereUtils.check_git_pull_output(pull_response)
+
+                if not pull_success:
+                    error_messages = {
+                        "local_changes": f"Git pull failed: Local changes detected in {web_app['source_directory']}. Please commit, stash, or reset your changes.",
+                        "untracked_files": f"Git pull failed: Untracked files detected in {web_app['source_directory']}. Please add or remove the files.",
+                        "git_error": "Git pull failed: Check your repository configuration and try again."
+                    }
+                    raise Exception(error_messages.get(pull_error, "Unknown Git pull error."))
+
+                info("Repository updated successfully.")
 
             except Exception as e:
-                set_failed(f"Error processing 'envs' input: {e}")
+                set_failed(e)
 
-        # 4. Git Pull
-        try:
-            client.send_input_to_console(
-                console_id,
-                f"git -C {web_app['source_directory']} pull",
-                "Checking repository status..."
-            )
-            
-            pull_response = client.get_latest_console_output(
-                console_id,
-                "Git Pull completed."
-            )
-            
-            pull_success, pull_error = PythonAnywhereUtils.check_git_pull_output(pull_response)
-
-            if not pull_success:
-                error_messages = {
-                    "local_changes": f"Git pull failed: Local changes detected in {web_app['source_directory']}. Please commit, stash, or reset your changes.",
-                    "untracked_files": f"Git pull failed: Untracked files detected in {web_app['source_directory']}. Please add or remove the files.",
-                    "git_error": "Git pull failed: Check your repository configuration and try again."
-                }
-                raise Exception(error_messages.get(pull_error, "Unknown Git pull error."))
-            
-            info("Repository updated successfully.")
-
-        except Exception as e:
-            set_failed(e)
-
-        # 5. Framework Commands (Django/Flask)
+        # 5. Framework Commands (Django/Flask/declarative)
         info(f"Executing commands for the {framework_type.capitalize()} framework...")
-        try:
-            framework_executor = FrameworkFactory.create(
-                framework_type,
-                client,
-                console_id,
-                web_app,
-                django_settings=django_settings
-            )
-            framework_executor.run_commands()
-
-        except ValueError as e:
-            set_failed(str(e))
-        except Exception as e:
-            raise Exception(f"Error during console commands for {framework_type.capitalize()}: {e}")
-
-        # 6. Reload WebApp
-        info(f"Reloading web app: {web_app['domain_name']}...")
-        client.reload_webapp(web_app['domain_name'])
+        with deadline.phase("framework"):
+            try:
+                framework_executor = FrameworkFactory.create(
+                    framework_type,
+                    client,
+                    _console["id"],
+                    web_app,
+                    django_settings=django_settings,
+                    cache=cache
+                )
+                framework_executor.run_commands()
+
+            except ValueError as e:
+                set_failed(str(e))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadline.expired():
+                    raise deadline.exceeded()
+                raise Exception(f"Error during console commands for {framework_type.capitalize()}: {e}")
+
+        # 6. Reload WebApp (and any additional web apps) and restart always-on tasks concurrently
+        domain_names = [web_app['domain_name']]
+        for extra_domain in (reload_domains or "").replace(",", " ").split():
+            if extra_domain not in domain_names:
+                domain_names.append(extra_domain)
+
+        with deadline.phase("reload"):
+            async_client = AsyncPythonAnywhereClient(username, api_token, host, deadline=deadline)
+            task_patterns = [line.strip() for line in (always_on_tasks or "").splitlines() if line.strip()]
+            DeployOrchestrator.run(async_client, domain_names, warm_up=warm_up, task_patterns=task_patterns)
 
         info("Web application reloaded successfully.")
 
+        if cache:
+            cache.save()
+            info(f"Discovery cache saved to {cache_file}.")
+        deployed = True
+
     except Exception as e:
         set_failed(str(e))
+    finally:
+        # A failed deploy may have been caused by stale metadata, rediscover on the next run
+        if cache and not deployed:
+            cache.clear()
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,97 @@
+"""
+Async PythonAnywhere API Client
+
+This module provides an asyncio variant of `PythonAnywhereClient`, so polling and
+multi-app operations can interleave on a single event loop instead of one thread each.
+"""
+
+from typing import Optional, Dict, Any
+from .github_utils import info
+from .deadline import DeadlineExceeded
+from .pa_client import BasePythonAnywhereClient
+from .transport import AsyncStdlibTransport
+
+class AsyncPythonAnywhereClient(BasePythonAnywhereClient):
+    """An asyncio client to interact with the PythonAnywhere API."""
+
+    def _default_transport(self):
+        return AsyncStdlibTransport()
+
+    async def _request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Performs a generic request to the API. Rate-limited (429) responses are retried
+        after the delay requested by the API, within the deadline.
+        """
+        url = f"{self.base_api_url}{path}"
+
+        for attempt in range(self.RATE_LIMIT_MAX_RETRIES + 1):
+            self.deadline.check()
+            info(f"Sending {method} request to: {url}")
+
+            try:
+                response = await self.transport.request(
+                    method, url, headers=self.headers, json_data=data,
+                    timeout=self.deadline.timeout(self.REQUEST_TIMEOUT)
+                )
+            except Exception as e:
+                raise self._request_failed(url, e)
+
+            if not self._should_retry(response, attempt):
+                break
+            delay = self._retry_after(response)
+            info(f"Rate limited by the API. Retrying in {delay:g} seconds...")
+            await self.deadline.sleep_async(delay)
+
+        return self._parse_response(url, response)
+
+    async def get_consoles(self) -> list:
+        """Lists the user's consoles."""
+        return await self._request("GET", "/consoles/")
+
+    async def get_latest_console_output(self, console_id: int, success_msg: str) -> Dict[str, Any]:
+        """Gets the latest console output, with retries."""
+        console_output_url = f"/consoles/{console_id}/get_latest_output/"
+
+        max_retries = self.OUTPUT_MAX_RETRIES
+        for attempt in range(max_retries):
+            try:
+                response = await self._request("GET", console_output_url)
+                info(success_msg)
+                return response
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    delay = self.deadline.timeout(self.OUTPUT_RETRY_DELAY)
+                    info(f"Attempt {attempt + 1} failed to get console output. Retrying in {delay:g} seconds...")
+                    await self.deadline.sleep_async(delay)
+                else:
+                    raise Exception(f"Failed to get console output after {max_retries} attempts: {e}")
+
+    async def send_input_to_console(self, console_id: int, command: str, success_msg: str):
+        """Sends a command to the console."""
+        console_request_url = f"/consoles/{console_id}/send_input/"
+        payload = {"input": f"{command}\n"}
+        info(f"Running command: {command}")
+        await self._request("POST", console_request_url, data=payload)
+        info(success_msg)
+
+    async def get_webapps(self) -> list:
+        """Lists the user's webapps."""
+        return await self._request("GET", "/webapps/")
+
+    async def reload_webapp(self, domain_name: str):
+        """Reloads a webapp."""
+        await self._request("POST", f"/webapps/{domain_name}/reload/")
+
+    async def get_always_on_tasks(self) -> list:
+        """Lists the user's always-on tasks."""
+        return await self._request("GET", "/always_on/")
+
+    async def restart_always_on_task(self, task_id: int):
+        """Restarts an always-on task."""
+        await self._request("POST", f"/always_on/{task_id}/restart/")
+
+    async def close(self):
+        """Closes the pooled connections of the transport."""
+        await self.transport.close()
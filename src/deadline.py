@@ -0,0 +1,155 @@
+"""
+Deploy Deadline
+
+This module provides a time budget shared by every phase of the deploy, so that API
+calls and polling loops never run past the overall (or per-phase) limit.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Callable
+
+class DeadlineExceeded(Exception):
+    """Raised when the deploy (or one of its phases) runs out of time."""
+
+    def __init__(self, phase: Optional[str], budget: Optional[float], elapsed: float):
+        self.phase = phase
+        self.budget = budget
+        self.elapsed = elapsed
+        where = f"phase '{phase}'" if phase else "deploy"
+        budget_msg = f"budget {budget:g}s, " if budget is not None else ""
+        super().__init__(f"Deadline exceeded during {where} ({budget_msg}elapsed {elapsed:.1f}s).")
+
+
+class Deadline:
+    """
+    Tracks the remaining time of the deploy.
+
+    A total budget of None means no overall limit. Per-phase budgets are applied
+    through `phase()`, and the effective remaining time is always the smaller of
+    the total and the active phase budget.
+    """
+
+    PHASES = ("setup", "envs", "git_pull", "framework", "reload")
+
+    def __init__(self, total: Optional[float] = None, phase_budgets: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.total = total
+        self.phase_budgets = phase_budgets or {}
+        self.started_at = clock()
+        self.expires_at = self.started_at + total if total is not None else None
+        self.current_phase: Optional[str] = None
+        self._phase_started_at: Optional[float] = None
+        self._phase_expires_at: Optional[float] = None
+
+    def _effective_expiry(self) -> Optional[float]:
+        candidates = [t for t in (self.expires_at, self._phase_expires_at) if t is not None]
+        return min(candidates) if candidates else None
+
+    def remaining(self) -> Optional[float]:
+        """Returns the seconds left before the nearest deadline, or None if unlimited."""
+        expiry = self._effective_expiry()
+        if expiry is None:
+            return None
+        return max(0.0, expiry - self.clock())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def exceeded(self) -> DeadlineExceeded:
+        """Builds the error describing which budget ran out."""
+        now = self.clock()
+        phase_overran = (
+            self._phase_expires_at is not None
+            and (self.expires_at is None or self._phase_expires_at <= self.expires_at)
+        )
+        if phase_overran:
+            return DeadlineExceeded(
+                self.current_phase,
+                self.phase_budgets.get(self.current_phase),
+                now - self._phase_started_at
+            )
+        return DeadlineExceeded(self.current_phase, self.total, now - self.started_at)
+
+    def check(self):
+        """Raises DeadlineExceeded if no time is left."""
+        if self.expired():
+            raise self.exceeded()
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Returns a timeout for a single blocking call, capped by the remaining time."""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+    def sleep(self, seconds: float):
+        """Sleeps for the given time, but never past the remaining budget."""
+        self.check()
+        time.sleep(self.timeout(seconds))
+        self.check()
+
+    async def sleep_async(self, seconds: float):
+        """Asyncio variant of `sleep`, never waiting past the remaining budget."""
+        self.check()
+        await asyncio.sleep(self.timeout(seconds))
+        self.check()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Runs a block of the deploy under the budget configured for `name`, if any."""
+        previous = (self.current_phase, self._phase_started_at, self._phase_expires_at)
+        self.current_phase = name
+        self._phase_started_at = self.clock()
+        budget = self.phase_budgets.get(name)
+        self._phase_expires_at = self._phase_started_at + budget if budget is not None else None
+        try:
+            self.check()
+            yield self
+        finally:
+            self.current_phase, self._phase_started_at, self._phase_expires_at = previous
+
+    @staticmethod
+    def parse_total(value: Optional[str]) -> Optional[float]:
+        """Parses the 'deploy_timeout' input (seconds); an empty value means no limit."""
+        if not value:
+            return None
+        try:
+            total = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid 'deploy_timeout' input: '{value}'. Expected a number of seconds.")
+        if not math.isfinite(total) or total <= 0:
+            raise ValueError(f"Invalid 'deploy_timeout' input: '{value}'. Expected a positive number of seconds.")
+        return total
+
+    @classmethod
+    def parse_phase_budgets(cls, phases_string: Optional[str]) -> Dict[str, float]:
+        """Parses a multi-line PHASE=SECONDS string into a dictionary."""
+        budgets = {}
+        if not phases_string:
+            return budgets
+
+        for line in phases_string.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=' not in line:
+                raise ValueError(f"Invalid phase timeout '{line}'. Expected PHASE=SECONDS.")
+            name, value = line.split('=', 1)
+            name = name.strip().lower()
+            if name not in cls.PHASES:
+                raise ValueError(f"Unknown phase '{name}' in phase timeouts. Expected one of: {', '.join(cls.PHASES)}.")
+            try:
+                budget = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid timeout for phase '{name}': {value.strip()}")
+            if not math.isfinite(budget) or budget <= 0:
+                raise ValueError(f"Invalid timeout for phase '{name}': {value.strip()}. Expected a positive number of seconds.")
+            budgets[name] = budget
+        return budgets
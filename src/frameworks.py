@@ -1,17 +1,28 @@
+import fnmatch
+import json
 import os
+import re
+import shlex
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from .pa_client import PythonAnywhereClient
 from .github_utils import info, set_failed
 from .pa_utils import PythonAnywhereUtils
+from .metadata_cache import MetadataCache
+from .deadline import DeadlineExceeded
 
 class Framework(ABC):
     """Abstract base class for frameworks."""
     
-    def __init__(self, client: PythonAnywhereClient, console_id: int, web_app: Dict[str, Any]):
+    def __init__(self, client: PythonAnywhereClient, console_id: int, web_app: Dict[str, Any],
+                 cache: Optional[MetadataCache] = None, **kwargs):
+        # Options meant for other frameworks (e.g. django_settings) are ignored
         self.client = client
         self.console_id = console_id
         self.web_app = web_app
+        self.cache = cache
         self.source_directory = web_app['source_directory']
         self.virtualenv_path = web_app['virtualenv_path']
 
@@ -39,8 +50,8 @@ class Framework(ABC):
 class DjangoFramework(Framework):
     """Implementation for the Django framework."""
 
-    def __init__(self, client: PythonAnywhereClient, console_id: int, web_app: Dict[str, Any], django_settings: Optional[str] = None):
-        super().__init__(client, console_id, web_app)
+    def __init__(self, client: PythonAnywhereClient, console_id: int, web_app: Dict[str, Any], django_settings: Optional[str] = None, **kwargs):
+        super().__init__(client, console_id, web_app, **kwargs)
         self.django_settings = django_settings
 
     def run_commands(self):
@@ -67,32 +78,21 @@ class FlaskFramework(Framework):
             self._activate_venv()
             self._install_requirements()
 
-            # Check Alembic
-            self.client.send_input_to_console(
-                self.console_id,
-                f"find {self.source_directory} -type f -name 'alembic.ini' -print",
-                "Checking for alembic.ini..."
-            )
-
-            alembic_response = self.client.get_latest_console_output(
-                self.console_id,
-                "Alembic check completed."
-            )
-
-            alembic_exists, alembic_path = PythonAnywhereUtils.parse_and_check_alembic(alembic_response)
+            alembic_exists, alembic_path = self._find_alembic()
 
             if alembic_exists and alembic_path:
                 info("Alembic configuration found, running migrations...")
-                alembic_dir = os.path.dirname(alembic_path)
-                self.client.send_input_to_console(
-                    self.console_id,
-                    f"cd {alembic_dir} && alembic upgrade head",
-                    "Executing 'alembic upgrade head'..."
-                )
-                alembic_upgrade_response = self.client.get_latest_console_output(
-                    self.console_id,
-                    "Alembic migration completed."
-                )
+                alembic_upgrade_response = self._alembic_upgrade(alembic_path)
+
+                if self.cache and self.cache.unconfirmed("alembic_paths") \
+                        and "No such file or directory" in alembic_upgrade_response.get("output", ""):
+                    info("Cached Alembic configuration is stale, searching for it again...")
+                    self._cached_alembic_paths().pop(self.source_directory, None)
+                    alembic_exists, alembic_path = self._find_alembic()
+                    if not (alembic_exists and alembic_path):
+                        info("No Alembic configuration found, skipping migrations.")
+                        return
+                    alembic_upgrade_response = self._alembic_upgrade(alembic_path)
 
                 if "FAILED" in alembic_upgrade_response.get("output", ""):
                     set_failed("Alembic migration failed. Check your configuration.")
@@ -104,6 +104,242 @@ class FlaskFramework(Framework):
         except Exception as e:
             raise Exception(f"Error during console commands for Flask: {e}")
 
+    def _alembic_upgrade(self, alembic_path: str) -> Dict[str, Any]:
+        """Runs 'alembic upgrade head' next to the given alembic.ini."""
+        alembic_dir = os.path.dirname(alembic_path)
+        self.client.send_input_to_console(
+            self.console_id,
+            f"cd {alembic_dir} && alembic upgrade head",
+            "Executing 'alembic upgrade head'..."
+        )
+        return self.client.get_latest_console_output(
+            self.console_id,
+            "Alembic migration completed."
+        )
+
+    def _cached_alembic_paths(self) -> Dict[str, str]:
+        alembic_paths = self.cache.get("alembic_paths")
+        if alembic_paths is None:
+            alembic_paths = {}
+            self.cache.set("alembic_paths", alembic_paths)
+        return alembic_paths
+
+    def _find_alembic(self):
+        """
+        Locates alembic.ini, using the cached path when available. Only found paths
+        are cached, so an Alembic setup added later is still detected.
+        """
+        if self.cache:
+            cached_path = self._cached_alembic_paths().get(self.source_directory)
+            if cached_path:
+                info(f"Using cached Alembic configuration: {cached_path}")
+                return True, cached_path
+
+        # Check Alembic
+        self.client.send_input_to_console(
+            self.console_id,
+            f"find {self.source_directory} -type f -name 'alembic.ini' -print",
+            "Checking for alembic.ini..."
+        )
+
+        alembic_response = self.client.get_latest_console_output(
+            self.console_id,
+            "Alembic check completed."
+        )
+
+        alembic_exists, alembic_path = PythonAnywhereUtils.parse_and_check_alembic(alembic_response)
+        if self.cache and alembic_exists and alembic_path:
+            # Stored again so the entry gets a fresh discovery time
+            self.cache.set("alembic_paths", dict(self._cached_alembic_paths(), **{self.source_directory: alembic_path}))
+        return alembic_exists, alembic_path
+
+
+class DeclarativeFramework(Framework):
+    """
+    Implementation for frameworks described by a declarative definition file.
+
+    Each step runs a console command, unless its skip conditions show that nothing it
+    depends on changed since the last successful deploy:
+
+    - `skip_unless_changed`: glob patterns of repository paths (from `git diff`).
+    - `skip_unless_hash_changed`: files whose SHA-256 hash is compared.
+
+    The deployed commit and file hashes are kept in the discovery cache, so without
+    a cache every step runs. Every command is wrapped in begin/end markers and the
+    console is polled until the end marker appears, so steps run one after another
+    and a step fails on a non-zero exit status or on its `fail_on`/`expect` output checks.
+    """
+
+    definition: Dict[str, Any] = {}
+
+    STEP_TIMEOUT = 600
+    POLL_INTERVAL = 1
+    MAX_POLL_INTERVAL = 5
+    COMMIT_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+    def run_commands(self):
+        name = self.definition["name"]
+        try:
+            if self.definition.get("activate_venv", True):
+                self._activate_venv()
+
+            state = self._probe()
+            for step in self.definition["steps"]:
+                reason = self._skip_reason(step, state)
+                if reason:
+                    info(f"Skipping step '{step['name']}': {reason}.")
+                    continue
+                self._run_step(step)
+
+            self._record_state(state)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Error during console commands for {name}: {e}")
+
+    def _format(self, command: str) -> str:
+        """Fills the {source_directory}, {virtualenv_path} and {domain_name} placeholders."""
+        placeholders = {
+            "source_directory": self.source_directory,
+            "virtualenv_path": self.virtualenv_path,
+            "domain_name": self.web_app.get("domain_name", ""),
+        }
+        # Plain replacement keeps other braces (e.g. shell ${VAR}) untouched
+        for key, value in placeholders.items():
+            command = command.replace(f"{{{key}}}", value)
+        return command
+
+    def _run_marked(self, command: str, label: str, timeout: float) -> Tuple[List[str], Optional[int]]:
+        """
+        Runs a command between unique begin/end markers and polls the console output
+        until the end marker appears. Returns the lines printed by the command and its
+        exit status. Waits are bounded by `timeout` and by the deploy deadline.
+        """
+        marker = f"__pa_redeploy_{uuid.uuid4().hex[:12]}__"
+        self.client.send_input_to_console(
+            self.console_id,
+            f"echo '{marker}-begin'; {command}; echo '{marker}-end:'$?",
+            f"{label} started."
+        )
+
+        title = label[0].upper() + label[1:]
+        started_at = time.monotonic()
+        interval = self.POLL_INTERVAL
+        while True:
+            result = PythonAnywhereUtils.extract_marked_output(
+                self.client.get_latest_console_output(self.console_id, f"Output of {label} received."),
+                marker
+            )
+            if result is not None:
+                return result
+
+            elapsed = time.monotonic() - started_at
+            if elapsed >= timeout:
+                raise Exception(f"{title} did not finish within {timeout:g} seconds.")
+            info(f"{title} still running, checking again in {interval:g} seconds...")
+            self.client.deadline.sleep(min(interval, timeout - elapsed))
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+
+    def _probe(self) -> Optional[Dict[str, Any]]:
+        """
+        Collects the current commit, the paths changed since the last deploy and the
+        file hashes with a single console command. Returns None when unavailable.
+        """
+        steps = self.definition["steps"]
+        hashed_files = sorted({path for step in steps for path in step.get("skip_unless_hash_changed", [])})
+        uses_diff = any(step.get("skip_unless_changed") for step in steps)
+        if not self.cache or not (hashed_files or uses_diff):
+            return None
+
+        previous = (self.cache.get("deploy_state") or {}).get(self.source_directory, {})
+        source = shlex.quote(self.source_directory)
+        parts = [f"git -C {source} rev-parse HEAD | sed 's/^/commit:/'"]
+        # The cache file is restored from outside the console, only trust a plain commit hash
+        previous_commit = previous.get("commit")
+        if not (isinstance(previous_commit, str) and self.COMMIT_PATTERN.fullmatch(previous_commit)):
+            previous_commit = None
+        if uses_diff and previous_commit:
+            # --relative lists paths from the source directory, like the hashed files
+            parts.append(
+                f"{{ git -C {source} diff --name-only --relative {shlex.quote(previous_commit)} HEAD || echo '!unknown'; }}"
+                " | sed 's/^/changed:/'"
+            )
+        if hashed_files:
+            files = " ".join(shlex.quote(path) for path in hashed_files)
+            parts.append(f"(cd {source} && sha256sum {files} 2>/dev/null) | sed 's/^/hash:/'")
+
+        try:
+            probe_lines, _ = self._run_marked("; ".join(parts), "change check", self.STEP_TIMEOUT)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            info(f"Could not check for changes ({e}), running every step.")
+            return None
+
+        state = {"commit": None, "changed": None, "hashes": {}, "previous": previous}
+        changed: List[str] = []
+        for line in probe_lines:
+            kind, _, value = line.partition(":")
+            if kind == "commit" and self.COMMIT_PATTERN.fullmatch(value.strip()):
+                state["commit"] = value.strip()
+            elif kind == "changed":
+                changed.append(value.strip())
+            elif kind == "hash":
+                digest, _, path = value.strip().partition("  ")
+                state["hashes"][path.strip()] = digest
+        if uses_diff and previous_commit and "!unknown" not in changed:
+            state["changed"] = changed
+        return state
+
+    @staticmethod
+    def _skip_reason(step: Dict[str, Any], state: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Returns why a step can be skipped, or None if it must run."""
+        patterns = step.get("skip_unless_changed", [])
+        hashed_files = step.get("skip_unless_hash_changed", [])
+        if state is None or not (patterns or hashed_files):
+            return None
+
+        if patterns:
+            if state["changed"] is None:
+                return None
+            if any(fnmatch.fnmatch(path, pattern) for path in state["changed"] for pattern in patterns):
+                return None
+
+        if hashed_files:
+            previous_hashes = state["previous"].get("hashes", {})
+            for path in hashed_files:
+                current = state["hashes"].get(path)
+                if current is None or current != previous_hashes.get(path):
+                    return None
+
+        return "no relevant changes since the last deploy"
+
+    def _run_step(self, step: Dict[str, Any]):
+        label = f"step '{step['name']}'"
+        lines, status = self._run_marked(self._format(step["command"]), label, step.get("timeout", self.STEP_TIMEOUT))
+        if status:
+            raise Exception(f"Step '{step['name']}' failed with exit status {status}.")
+        info(f"Step '{step['name']}' completed.")
+
+        output = "\n".join(lines)
+        failure = next((text for text in step.get("fail_on", []) if text in output), None)
+        if failure:
+            raise Exception(f"Step '{step['name']}' failed: found '{failure}' in the output.")
+        missing = next((text for text in step.get("expect", []) if text not in output), None)
+        if missing:
+            raise Exception(f"Step '{step['name']}' failed: expected '{missing}' in the output.")
+
+    def _record_state(self, state: Optional[Dict[str, Any]]):
+        """Stores the deployed commit and file hashes for the next run."""
+        if state is None or not state["commit"]:
+            return
+        deploy_states = dict(self.cache.get("deploy_state") or {})
+        deploy_states[self.source_directory] = {
+            "commit": state["commit"],
+            "hashes": state["hashes"],
+        }
+        self.cache.set("deploy_state", deploy_states)
+
 
 class FrameworkFactory:
     """Factory responsible for creating framework instances."""
@@ -118,6 +354,55 @@ class FrameworkFactory:
         """Allows dynamic registration of new framework types."""
         cls._registry[name.lower()] = framework_cls
 
+    @classmethod
+    def load_definition(cls, path: str) -> str:
+        """
+        Loads a declarative framework definition (JSON, or YAML when PyYAML is
+        installed) and registers it. Returns the framework name.
+        """
+        with open(path, "r", encoding="utf-8") as definition_file:
+            content = definition_file.read()
+
+        if path.endswith((".yml", ".yaml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required to read YAML framework definitions. Install it or use a JSON file.")
+            definition = yaml.safe_load(content)
+        else:
+            try:
+                definition = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid framework definition {path}: {e}")
+
+        cls._validate_definition(definition, path)
+        name = definition["name"].lower()
+        if name in cls._registry:
+            raise ValueError(f"Invalid framework definition {path}: framework '{name}' is already registered. Choose another name.")
+        framework_cls = type(f"{name.capitalize()}Framework", (DeclarativeFramework,), {"definition": definition})
+        cls.register_framework(name, framework_cls)
+        info(f"Framework '{name}' loaded from {path}.")
+        return name
+
+    @staticmethod
+    def _validate_definition(definition: Any, path: str):
+        if not isinstance(definition, dict) or not isinstance(definition.get("name"), str):
+            raise ValueError(f"Invalid framework definition {path}: a 'name' is required.")
+        steps = definition.get("steps")
+        if not isinstance(steps, list) or not steps:
+            raise ValueError(f"Invalid framework definition {path}: 'steps' must be a non-empty list.")
+
+        for index, step in enumerate(steps, start=1):
+            if not isinstance(step, dict) or not isinstance(step.get("name"), str) or not isinstance(step.get("command"), str):
+                raise ValueError(f"Invalid framework definition {path}: step {index} needs a 'name' and a 'command'.")
+            timeout = step.get("timeout", DeclarativeFramework.STEP_TIMEOUT)
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise ValueError(f"Invalid framework definition {path}: 'timeout' of step '{step['name']}' must be a positive number of seconds.")
+            for key in ("skip_unless_changed", "skip_unless_hash_changed", "fail_on", "expect"):
+                value = step.get(key, [])
+                if not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+                    raise ValueError(f"Invalid framework definition {path}: '{key}' of step '{step['name']}' must be a list of strings.")
+
     @classmethod
     def create(cls, framework_type: str, client: PythonAnywhereClient, console_id: int, web_app: Dict[str, Any], **kwargs) -> Framework:
         framework_type = framework_type.lower()
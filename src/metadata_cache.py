@@ -0,0 +1,131 @@
+"""
+Discovery Metadata Cache
+
+This module persists account metadata (console, web app records, resolved Alembic
+paths) in a JSON file between runs, so a deploy can skip the discovery round trips.
+The file is meant to be restored and saved with `actions/cache`.
+"""
+
+import json
+import math
+import os
+import time
+from typing import Optional, Any, Callable
+from .github_utils import info
+
+class MetadataCache:
+    """
+    JSON file cache with a time-to-live.
+
+    Each entry keeps the time it was discovered live; saving the file again does not
+    refresh it, so an entry expires `ttl` seconds after its last live discovery.
+    Entries read from the file are "unconfirmed" until a successful call proves them
+    valid, so callers can fall back to live discovery on their first failure.
+    """
+
+    VERSION = 2
+    DEFAULT_TTL = 86400
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, key: str = "", clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl = ttl
+        self.key = key
+        self.clock = clock
+        self.entries = {}
+        self.discovered_at = {}
+        self._unconfirmed = set()
+        self._load()
+
+    @classmethod
+    def parse_ttl(cls, value: Optional[str]) -> float:
+        """Parses the 'cache_ttl' input, in seconds. Empty means the default TTL."""
+        if not value:
+            return cls.DEFAULT_TTL
+        try:
+            ttl = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid 'cache_ttl' input: '{value}'. Expected a number of seconds.")
+        if not math.isfinite(ttl) or ttl <= 0:
+            raise ValueError(f"Invalid 'cache_ttl' input: '{value}'. Expected a positive number of seconds.")
+        return ttl
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            info("No discovery cache found, running live discovery.")
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            info(f"Ignoring unreadable discovery cache {self.path}: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != self.VERSION or data.get("key") != self.key:
+            info("Discovery cache belongs to another account or version, ignoring it.")
+            return
+
+        now = self.clock()
+        expired = []
+        for name, entry in data.get("entries", {}).items():
+            discovered_at = entry.get("discovered_at", 0)
+            if now - discovered_at > self.ttl:
+                expired.append(name)
+                continue
+            self.entries[name] = entry.get("value")
+            self.discovered_at[name] = discovered_at
+
+        if expired:
+            info(f"Discovery cache entries expired: {', '.join(sorted(expired))}.")
+        self._unconfirmed = set(self.entries)
+        info(f"Discovery cache loaded from {self.path}.")
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.entries.get(name, default)
+
+    def set(self, name: str, value: Any):
+        """Stores a live-discovered value, which is confirmed by definition."""
+        self.entries[name] = value
+        self.discovered_at[name] = self.clock()
+        self._unconfirmed.discard(name)
+
+    def unconfirmed(self, name: str) -> bool:
+        """Returns True if the entry came from the file and has not been proven valid yet."""
+        return name in self._unconfirmed
+
+    def confirm(self, name: str):
+        self._unconfirmed.discard(name)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drops one entry, or every entry when no name is given."""
+        if name is None:
+            self.entries.clear()
+            self.discovered_at.clear()
+            self._unconfirmed.clear()
+        else:
+            self.entries.pop(name, None)
+            self.discovered_at.pop(name, None)
+            self._unconfirmed.discard(name)
+
+    def save(self):
+        """Writes the cache file atomically, keeping each entry's discovery time."""
+        data = {
+            "version": self.VERSION,
+            "key": self.key,
+            "entries": {
+                name: {"value": value, "discovered_at": self.discovered_at[name]}
+                for name, value in self.entries.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(data, cache_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Removes the cache file, so the next run performs live discovery."""
+        self.invalidate()
+        if os.path.exists(self.path):
+            os.remove(self.path)
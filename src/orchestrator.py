@@ -0,0 +1,148 @@
+"""
+Deploy Orchestrator
+
+This module runs the post-deploy operations (web app reloads, warm-up requests and
+always-on task restarts) concurrently on a single asyncio event loop.
+"""
+
+import asyncio
+import fnmatch
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from .github_utils import info
+from .async_pa_client import AsyncPythonAnywhereClient
+from .deadline import DeadlineExceeded
+
+class DeployOrchestrator:
+    """Schedules the asynchronous deploy operations and reports their timings."""
+
+    WARM_UP_TIMEOUT = 30
+
+    def __init__(self, client: AsyncPythonAnywhereClient, max_concurrency: int = 10):
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+    async def reload_webapp(self, domain_name: str) -> float:
+        """Reloads a web app and returns how long it took."""
+        started_at = time.monotonic()
+        info(f"Reloading web app: {domain_name}...")
+        await self.client.reload_webapp(domain_name)
+        elapsed = time.monotonic() - started_at
+        info(f"Web app '{domain_name}' reloaded in {elapsed:.1f}s.")
+        return elapsed
+
+    async def warm_up(self, domain_name: str) -> float:
+        """Sends a first request to a reloaded web app so it is ready to serve traffic."""
+        started_at = time.monotonic()
+        self.client.deadline.check()
+        try:
+            response = await self.client.transport.request(
+                "GET", f"https://{domain_name}/",
+                timeout=self.client.deadline.timeout(self.WARM_UP_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            if self.client.deadline.expired():
+                raise self.client.deadline.exceeded()
+            raise Exception(f"Warm-up request to {domain_name} timed out.")
+        elapsed = time.monotonic() - started_at
+        if response.status_code >= 500:
+            raise Exception(f"Warm-up request to {domain_name} failed with status {response.status_code}.")
+        info(f"Web app '{domain_name}' warmed up in {elapsed:.1f}s (status {response.status_code}).")
+        return elapsed
+
+    async def restart_always_on_task(self, task: Dict[str, Any]) -> float:
+        """Restarts an always-on task and returns how long it took."""
+        started_at = time.monotonic()
+        await self.client.restart_always_on_task(task["id"])
+        elapsed = time.monotonic() - started_at
+        info(f"Always-on task {task['id']} ({task.get('description') or task.get('command')}) restarted in {elapsed:.1f}s.")
+        return elapsed
+
+    @staticmethod
+    def match_always_on_tasks(tasks: List[Dict[str, Any]], patterns: List[str]) -> List[Dict[str, Any]]:
+        """
+        Selects the enabled tasks whose full command or description matches any of the
+        glob patterns (e.g. '*celery*' also matches '/home/u/.virtualenvs/x/bin/celery ...').
+        """
+        return [
+            task for task in tasks
+            if task.get("enabled", True) and any(
+                fnmatch.fnmatch(task.get(field) or "", pattern)
+                for pattern in patterns
+                for field in ("command", "description")
+            )
+        ]
+
+    async def _finalize_webapp(self, semaphore: asyncio.Semaphore, domain_name: str, warm_up: bool) -> Dict[str, float]:
+        async with semaphore:
+            timings = {"reload": await self.reload_webapp(domain_name)}
+            if warm_up:
+                timings["warm_up"] = await self.warm_up(domain_name)
+            return timings
+
+    async def _restart_task(self, semaphore: asyncio.Semaphore, task: Dict[str, Any]) -> float:
+        async with semaphore:
+            return await self.restart_always_on_task(task)
+
+    async def _restart_matching_tasks(self, semaphore: asyncio.Semaphore, task_patterns: List[str]) -> List[Tuple[str, Any]]:
+        async with semaphore:
+            tasks = self.match_always_on_tasks(await self.client.get_always_on_tasks(), task_patterns)
+        if not tasks:
+            info(f"No always-on tasks match {', '.join(task_patterns)}.")
+
+        results = await asyncio.gather(
+            *(self._restart_task(semaphore, task) for task in tasks),
+            return_exceptions=True
+        )
+        return [(task["id"], result) for task, result in zip(tasks, results)]
+
+    async def finalize(self, domain_names: List[str], warm_up: bool = False,
+                       task_patterns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Reloads (and optionally warms up) every web app and restarts the always-on
+        tasks matching `task_patterns`, all concurrently. Concurrent API calls are
+        limited by `max_concurrency` to stay within the API rate limits.
+
+        Raises an exception listing every operation that failed, after all of them ran.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        operations = [self._finalize_webapp(semaphore, domain_name, warm_up) for domain_name in domain_names]
+        if task_patterns:
+            operations.append(self._restart_matching_tasks(semaphore, task_patterns))
+        results = await asyncio.gather(*operations, return_exceptions=True)
+
+        outcomes = [("webapps", domain_name, result) for domain_name, result in zip(domain_names, results)]
+        if task_patterns:
+            task_results = results[-1]
+            if isinstance(task_results, BaseException):
+                outcomes.append(("always_on_tasks", "listing", task_results))
+            else:
+                outcomes += [("always_on_tasks", task_id, result) for task_id, result in task_results]
+
+        timings: Dict[str, Dict[str, Any]] = {"webapps": {}, "always_on_tasks": {}}
+        failures: List[str] = []
+        for group, key, result in outcomes:
+            if isinstance(result, DeadlineExceeded):
+                raise result
+            if isinstance(result, BaseException):
+                label = "web app" if group == "webapps" else "always-on task"
+                failures.append(f"{label} {key}: {result}")
+            else:
+                timings[group][key] = result
+
+        if failures:
+            raise Exception("Post-deploy operations failed for " + "; ".join(failures))
+        return timings
+
+    @staticmethod
+    def run(client: AsyncPythonAnywhereClient, domain_names: List[str], warm_up: bool = False,
+            task_patterns: Optional[List[str]] = None, max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Runs `finalize` on a new event loop, closing the client connections afterwards."""
+        async def _main():
+            orchestrator = DeployOrchestrator(client, max_concurrency or 10)
+            try:
+                return await orchestrator.finalize(domain_names, warm_up=warm_up, task_patterns=task_patterns)
+            finally:
+                await client.close()
+
+        return asyncio.run(_main())
@@ -7,47 +7,126 @@ Based on the PythonAnywhere API (beta) documentation:
 https://help.pythonanywhere.com/pages/API/
 """
 
-import requests
+import asyncio
 import json
-import time
+from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 from .github_utils import info
+from .deadline import Deadline, DeadlineExceeded
+from .transport import create_transport
 
-class PythonAnywhereClient:
-    """A client to interact with the PythonAnywhere API."""
+class APIError(Exception):
+    """Raised when the API answers with an error status."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BasePythonAnywhereClient(ABC):
+    """
+    Configuration and response handling shared by the sync and async clients, so
+    both build the same requests and report errors the same way.
+    """
 
-    def __init__(self, username: str, token: str, host: str):
+    REQUEST_TIMEOUT = 30
+    OUTPUT_MAX_RETRIES = 5
+    OUTPUT_RETRY_DELAY = 5
+    RATE_LIMIT_MAX_RETRIES = 3
+    RATE_LIMIT_DEFAULT_DELAY = 5
+
+    def __init__(self, username: str, token: str, host: str, deadline: Optional[Deadline] = None,
+                 transport: Optional[Any] = None):
         self.username = username
         self.token = token
         self.host = host
+        self.deadline = deadline or Deadline()
+        self.transport = transport or self._default_transport()
         self.base_api_url = f"https://{self.host}/api/v0/user/{self.username}"
         self.headers = {
             "Authorization": f"Token {self.token}",
             "Content-Type": "application/json",
         }
 
-    def _request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Performs a generic request to the API."""
-        url = f"{self.base_api_url}{path}"
-        info(f"Sending {method} request to: {url}")
-        
+    @abstractmethod
+    def _default_transport(self):
+        """Returns the transport used when none is given."""
+        pass
+
+    @staticmethod
+    def _api_error(response) -> APIError:
+        """Builds the exception raised for an API error response."""
+        error_message = f"API Error: {response.status_code} - {response.text}"
+        if response.status_code == 400:
+            try:
+                error_data = response.json()
+                if "error" in error_data:
+                    error_message = error_data["error"]
+            except json.JSONDecodeError:
+                pass
+        return APIError(error_message, response.status_code)
+
+    def _request_failed(self, url: str, error: Exception) -> Exception:
+        """Builds the exception raised when a request could not complete."""
+        if self.deadline.expired():
+            return self.deadline.exceeded()
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError)) and not str(error):
+            error = "request timed out"
+        return Exception(f"Request to {url} failed: {error}")
+
+    def _should_retry(self, response, attempt: int) -> bool:
+        """Rate-limited (429) responses are retried a limited number of times."""
+        return response.status_code == 429 and attempt < self.RATE_LIMIT_MAX_RETRIES
+
+    def _retry_after(self, response) -> float:
+        retry_after = response.headers.get("retry-after") or response.headers.get("Retry-After")
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            return self.RATE_LIMIT_DEFAULT_DELAY
+
+    def _parse_response(self, url: str, response) -> Dict[str, Any]:
+        if response.status_code >= 400:
+            raise self._api_error(response)
         try:
-            response = requests.request(method, url, headers=self.headers, json=data)
-            response.raise_for_status()
             return response.json() if response.content else {}
-        except requests.exceptions.HTTPError as e:
-            error_message = f"API Error: {e.response.status_code} - {e.response.text}"
-            if e.response.status_code == 400:
-                try:
-                    error_data = e.response.json()
-                    if "error" in error_data:
-                        error_message = error_data["error"]
-                except json.JSONDecodeError:
-                    pass
-            raise Exception(error_message)
         except Exception as e:
             raise Exception(f"Request to {url} failed: {e}")
 
+
+class PythonAnywhereClient(BasePythonAnywhereClient):
+    """A client to interact with the PythonAnywhere API."""
+
+    def _default_transport(self):
+        return create_transport()
+
+    def _request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Performs a generic request to the API. Rate-limited (429) responses are retried
+        after the delay requested by the API, within the deadline.
+        """
+        url = f"{self.base_api_url}{path}"
+
+        for attempt in range(self.RATE_LIMIT_MAX_RETRIES + 1):
+            self.deadline.check()
+            info(f"Sending {method} request to: {url}")
+
+            try:
+                response = self.transport.request(
+                    method, url, headers=self.headers, json_data=data,
+                    timeout=self.deadline.timeout(self.REQUEST_TIMEOUT)
+                )
+            except Exception as e:
+                raise self._request_failed(url, e)
+
+            if not self._should_retry(response, attempt):
+                break
+            delay = self._retry_after(response)
+            info(f"Rate limited by the API. Retrying in {delay:g} seconds...")
+            self.deadline.sleep(delay)
+
+        return self._parse_response(url, response)
+
     def get_consoles(self) -> list:
         """Lists the user's consoles."""
         return self._request("GET", "/consoles/")
@@ -56,16 +135,19 @@ class PythonAnywhereClient:
         """Gets the latest console output, with retries."""
         console_output_url = f"/consoles/{console_id}/get_latest_output/"
         
-        max_retries = 5
+        max_retries = self.OUTPUT_MAX_RETRIES
         for attempt in range(max_retries):
             try:
                 response = self._request("GET", console_output_url)
                 info(success_msg)
                 return response
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 if attempt < max_retries - 1:
-                    info(f"Attempt {attempt + 1} failed to get console output. Retrying in 5 seconds...")
-                    time.sleep(5)
+                    delay = self.deadline.timeout(self.OUTPUT_RETRY_DELAY)
+                    info(f"Attempt {attempt + 1} failed to get console output. Retrying in {delay:g} seconds...")
+                    self.deadline.sleep(delay)
                 else:
                     raise Exception(f"Failed to get console output after {max_retries} attempts: {e}")
 
@@ -81,6 +163,10 @@ class PythonAnywhereClient:
         """Lists the user's webapps."""
         return self._request("GET", "/webapps/")
 
+    def get_webapp(self, domain_name: str) -> Dict[str, Any]:
+        """Gets a single webapp."""
+        return self._request("GET", f"/webapps/{domain_name}/")
+
     def reload_webapp(self, domain_name: str):
         """Reloads a webapp."""
         self._request("POST", f"/webapps/{domain_name}/reload/")
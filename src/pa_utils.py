@@ -1,6 +1,8 @@
-from typing import Optional, Dict, Any, Tuple
+import re
+from typing import Optional, Dict, Any, Tuple, Callable, List
 from .github_utils import info
-from .pa_client import PythonAnywhereClient
+from .pa_client import PythonAnywhereClient, APIError
+from .metadata_cache import MetadataCache
 
 class PythonAnywhereUtils:
     """
@@ -9,24 +11,41 @@ class PythonAnywhereUtils:
     """
 
     @staticmethod
-    def setup_console(client: PythonAnywhereClient) -> Dict[str, Any]:
-        """Configures or finds an existing bash/sh console."""
+    def setup_console(client: PythonAnywhereClient, cache: Optional[MetadataCache] = None) -> Dict[str, Any]:
+        """Configures or finds an existing bash/sh console, consulting the cache first."""
         info("Setting up console...")
+        if cache and cache.get("console"):
+            cached_console = cache.get("console")
+            info(f"Using cached console with ID: {cached_console['id']}")
+            return cached_console
+
         console_list_data = client.get_consoles()
         
         if isinstance(console_list_data, list) and console_list_data:
             valid_console = next((c for c in console_list_data if c.get("executable") in ["bash", "sh"]), None)
             if valid_console:
                 info(f"Console found with ID: {valid_console['id']}")
+                if cache:
+                    cache.set("console", valid_console)
                 return valid_console
             
         raise Exception("No bash/sh console found. Please create one in your PythonAnywhere account.")
 
     @staticmethod
-    def setup_web_app(client: PythonAnywhereClient, domain_name: Optional[str]) -> Dict[str, Any]:
-        """Finds the web app to be re-deployed."""
+    def setup_web_app(client: PythonAnywhereClient, domain_name: Optional[str], cache: Optional[MetadataCache] = None) -> Dict[str, Any]:
+        """Finds the web app to be re-deployed, consulting the cache first."""
         info("Setting up web app...")
-        webapp_list_data = client.get_webapps()
+        webapp_list_data = cache.get("webapps") if cache else None
+        cache_has_app = bool(webapp_list_data) and (
+            not domain_name or any(app.get("domain_name") == domain_name for app in webapp_list_data)
+        )
+
+        if cache_has_app:
+            info("Using cached web app records.")
+        else:
+            webapp_list_data = client.get_webapps()
+            if cache and isinstance(webapp_list_data, list) and webapp_list_data:
+                cache.set("webapps", webapp_list_data)
         
         if not (isinstance(webapp_list_data, list) and webapp_list_data):
             raise Exception("No web applications found. Check your application or account details!")
@@ -39,9 +58,55 @@ class PythonAnywhereUtils:
             web_app = webapp_list_data[0]
             info(f"No domain name specified. Using the first web app: {web_app.get('domain_name')}")
             
+        if cache_has_app and cache.unconfirmed("webapps"):
+            if not PythonAnywhereUtils._web_app_is_current(client, web_app):
+                info(f"Cached record of web app '{web_app.get('domain_name')}' is stale. Rediscovering web apps...")
+                cache.invalidate("webapps")
+                return PythonAnywhereUtils.setup_web_app(client, domain_name, cache)
+            cache.confirm("webapps")
+
         info(f"Web app '{web_app.get('domain_name')}' selected.")
         return web_app
 
+    @staticmethod
+    def _web_app_is_current(client: PythonAnywhereClient, web_app: Dict[str, Any]) -> bool:
+        """Compares a cached web app record with the live one, so stale paths are never deployed to."""
+        try:
+            live_app = client.get_webapp(web_app.get("domain_name"))
+        except APIError as e:
+            if e.status_code != 404:
+                raise
+            return False
+        return all(live_app.get(key) == web_app.get(key) for key in ("source_directory", "virtualenv_path"))
+
+    @staticmethod
+    def run_on_console(client: PythonAnywhereClient, console: Dict[str, Any], action: Callable[[int], Any],
+                       cache: Optional[MetadataCache] = None) -> Dict[str, Any]:
+        """
+        Runs `action(console_id)` and returns the console that was used.
+
+        If the console came from the cache and has not been confirmed yet, and the API
+        reports it no longer exists (404), it is rediscovered live and the action retried
+        once. Other failures (network errors, timeouts) propagate, as the command may
+        already have run.
+        """
+        if not (cache and cache.unconfirmed("console")):
+            action(console["id"])
+            return console
+
+        try:
+            action(console["id"])
+        except APIError as e:
+            if e.status_code != 404:
+                raise
+            info(f"Cached console {console['id']} failed ({e}). Rediscovering consoles...")
+            cache.invalidate("console")
+            console = PythonAnywhereUtils.setup_console(client, cache)
+            action(console["id"])
+
+        cache.confirm("console")
+        return console
+
     @staticmethod
     def check_git_pull_output(response: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Checks the output of the git pull command."""
@@ -112,3 +177,29 @@ class PythonAnywhereUtils:
         else:
             info("Alembic configuration not found, skipping migrations.")
             return False, None
+
+    @staticmethod
+    def extract_marked_output(response: Dict[str, Any], marker: str) -> Optional[Tuple[List[str], Optional[int]]]:
+        """
+        Returns the output lines printed between the last '<marker>-begin' and
+        '<marker>-end[:STATUS]' lines with the exit status reported by the end line,
+        or None if the block is not (yet) in the console output.
+        When the begin line already scrolled out of the output, every line before the
+        end line is returned.
+        """
+        output = response.get("output", "")
+        lines = [line.strip() for line in output.splitlines()]
+
+        end_pattern = re.compile(rf"{re.escape(marker)}-end(?::(\d+))?")
+        end, status = None, None
+        for index in range(len(lines) - 1, -1, -1):
+            match = end_pattern.fullmatch(lines[index])
+            if match:
+                end, status = index, match.group(1)
+                break
+        if end is None:
+            return None
+
+        begin_line = f"{marker}-begin"
+        begin = next((i for i in range(end - 1, -1, -1) if lines[i] == begin_line), -1)
+        return [line for line in lines[begin + 1:end] if line], int(status) if status is not None else None
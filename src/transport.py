@@ -0,0 +1,259 @@
+"""
+HTTP Transports
+
+This module provides the HTTP backends used by the PythonAnywhere client. The stdlib
+backend needs no third-party packages, so the action can run on the runner's system
+Python without an install step; the requests backend is only imported when selected.
+"""
+
+import asyncio
+import http.client
+import json
+import ssl
+from typing import Optional, Dict, Any, Tuple, List
+from urllib.parse import urlsplit
+
+# Methods that can be safely re-sent when a kept-alive connection turns out to be closed
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class TransportResponse:
+    """Minimal HTTP response shared by all transports."""
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class RequestsTransport:
+    """Transport based on the `requests` package, reusing connections through a session."""
+
+    name = "requests"
+
+    def __init__(self):
+        import requests
+        self.session = requests.Session()
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                json_data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        response = self.session.request(method, url, headers=headers, json=json_data, timeout=timeout)
+        return TransportResponse(response.status_code, response.content, dict(response.headers))
+
+    def close(self):
+        self.session.close()
+
+
+class StdlibTransport:
+    """Zero-dependency transport based on `http.client`, keeping one connection alive per host."""
+
+    name = "stdlib"
+
+    # Errors raised when the server silently closed a kept-alive connection
+    _STALE_CONNECTION_ERRORS = (
+        http.client.RemoteDisconnected,
+        http.client.CannotSendRequest,
+        ConnectionResetError,
+        BrokenPipeError,
+    )
+    # Errors raised before the request reached the server, so any method can be re-sent
+    _NOT_SENT_ERRORS = (http.client.CannotSendRequest, BrokenPipeError)
+
+    def __init__(self):
+        self._connections: Dict[Tuple[str, str], http.client.HTTPConnection] = {}
+
+    def _connection(self, scheme: str, netloc: str, timeout: Optional[float]) -> Tuple[http.client.HTTPConnection, bool]:
+        key = (scheme, netloc)
+        conn = self._connections.get(key)
+        reused = conn is not None
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(netloc, timeout=timeout)
+            self._connections[key] = conn
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, reused
+
+    def _discard(self, scheme: str, netloc: str):
+        conn = self._connections.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                json_data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        body = json.dumps(json_data).encode("utf-8") if json_data is not None else None
+
+        while True:
+            conn, reused = self._connection(parts.scheme, parts.netloc, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                content = response.read()
+            except self._STALE_CONNECTION_ERRORS as e:
+                self._discard(parts.scheme, parts.netloc)
+                if reused and (method in IDEMPOTENT_METHODS or isinstance(e, self._NOT_SENT_ERRORS)):
+                    # The kept-alive connection was closed by the server, retry on a fresh one.
+                    # Other methods are not retried, as the server may have processed them.
+                    continue
+                raise
+            except Exception:
+                self._discard(parts.scheme, parts.netloc)
+                raise
+
+            if response.will_close:
+                self._discard(parts.scheme, parts.netloc)
+            return TransportResponse(response.status, content, dict(response.getheaders()))
+
+    def close(self):
+        for key in list(self._connections):
+            self._discard(*key)
+
+
+class AsyncStdlibTransport:
+    """
+    Zero-dependency asyncio transport speaking HTTP/1.1 over `asyncio` streams.
+
+    Idle connections are pooled per host, so concurrent requests each get their own
+    connection while sequential ones reuse it.
+    """
+
+    name = "stdlib"
+
+    def __init__(self):
+        self._idle: Dict[Tuple[str, str], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def _open(self, scheme: str, netloc: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        host, _, port = netloc.partition(":")
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return await asyncio.open_connection(host, int(port or 443), ssl=self._ssl_context)
+        return await asyncio.open_connection(host, int(port or 80))
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str) -> Tuple[int, Dict[str, str], bytes, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server.")
+        version, status, *_ = status_line.decode("latin-1").split(None, 2)
+        status_code = int(status)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skip optional trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await reader.readexactly(int(headers["content-length"]))
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        return status_code, headers, content, keep_alive
+
+    async def _send(self, method: str, url: str, headers: Optional[Dict[str, str]],
+                    json_data: Optional[Dict[str, Any]]) -> TransportResponse:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        body = json.dumps(json_data).encode("utf-8") if json_data is not None else b""
+
+        request_lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}"]
+        request_lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if body or method in ("POST", "PUT", "PATCH"):
+            request_lines.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(request_lines) + "\r\n\r\n").encode("latin-1") + body
+
+        while True:
+            idle = self._idle.get(key)
+            reused = bool(idle)
+            reader, writer = idle.pop() if reused else await self._open(parts.scheme, parts.netloc)
+            try:
+                sent = False
+                if reused and reader.at_eof():
+                    # The server closed the kept-alive connection while it was idle
+                    raise ConnectionResetError("Connection closed by server.")
+                writer.write(payload)
+                sent = True
+                await writer.drain()
+                status_code, response_headers, content, keep_alive = await self._read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and (not sent or method in IDEMPOTENT_METHODS):
+                    # The kept-alive connection was closed by the server, retry on a fresh one.
+                    # Other methods are not retried, as the server may have processed them.
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+            return TransportResponse(status_code, content, response_headers)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      json_data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> TransportResponse:
+        return await asyncio.wait_for(self._send(method, url, headers, json_data), timeout)
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+def create_transport(backend: Optional[str] = "auto"):
+    """
+    Creates a transport by name: 'requests', 'stdlib', or 'auto' (requests when it
+    is installed, otherwise stdlib).
+    """
+    backend = (backend or "auto").lower()
+
+    if backend == "stdlib":
+        return StdlibTransport()
+    if backend == "requests":
+        return RequestsTransport()
+    if backend == "auto":
+        try:
+            return RequestsTransport()
+        except ImportError:
+            return StdlibTransport()
+
+    raise ValueError(f"HTTP backend '{backend}' not supported.")
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.async_pa_client import AsyncPythonAnywhereClient
+from src.deadline import Deadline, DeadlineExceeded
+from src.transport import TransportResponse
+
+
+class FakeAsyncTransport:
+    """Async transport returning queued responses and recording requests."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def request(self, method, url, headers=None, json_data=None, timeout=None):
+        self.requests.append((method, url, json_data))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def close(self):
+        pass
+
+
+def make_client(responses, deadline=None):
+    return AsyncPythonAnywhereClient(
+        "testuser", "testtoken", "www.pythonanywhere.com",
+        deadline=deadline,
+        transport=FakeAsyncTransport(responses)
+    )
+
+
+@patch("src.async_pa_client.info")
+def test_get_consoles(mock_info):
+    """Should return the decoded JSON body."""
+    client = make_client([TransportResponse(200, b'[{"id": 1}]')])
+
+    assert asyncio.run(client.get_consoles()) == [{"id": 1}]
+    mock_info.assert_called_once_with(f"Sending GET request to: {client.base_api_url}/consoles/")
+
+
+def test_request_error_uses_api_message():
+    """Should raise an exception with the API error message."""
+    client = make_client([TransportResponse(400, b'{"error": "Invalid request"}')])
+
+    with pytest.raises(Exception, match="Invalid request"):
+        asyncio.run(client.reload_webapp("app.pythonanywhere.com"))
+
+
+@patch("src.async_pa_client.info")
+def test_send_input_to_console(mock_info):
+    """Should post the command with a trailing newline."""
+    client = make_client([TransportResponse(200, b"")])
+
+    asyncio.run(client.send_input_to_console(7, "ls -la", "Done"))
+
+    method, url, payload = client.transport.requests[0]
+    assert (method, payload) == ("POST", {"input": "ls -la\n"})
+    assert url.endswith("/consoles/7/send_input/")
+    mock_info.assert_any_call("Done")
+
+
+@patch("src.async_pa_client.info")
+def test_get_latest_console_output_with_retries(mock_info):
+    """Should retry failed requests without blocking the event loop."""
+    client = make_client([
+        ConnectionError("reset"),
+        ConnectionError("reset"),
+        TransportResponse(200, b'{"output": "OK"}'),
+    ])
+
+    client.OUTPUT_RETRY_DELAY = 0
+
+    response = asyncio.run(client.get_latest_console_output(42, "Success"))
+
+    assert response == {"output": "OK"}
+    assert len(client.transport.requests) == 3
+    mock_info.assert_any_call("Attempt 2 failed to get console output. Retrying in 0 seconds...")
+
+
+@patch("src.async_pa_client.info")
+def test_rate_limited_request_is_retried(mock_info):
+    """Should wait for the Retry-After delay and retry a 429 response."""
+    client = make_client([
+        TransportResponse(429, b"", {"retry-after": "0"}),
+        TransportResponse(200, b""),
+    ])
+
+    asyncio.run(client.restart_always_on_task(3))
+
+    assert len(client.transport.requests) == 2
+    assert client.transport.requests[1][1].endswith("/always_on/3/restart/")
+    mock_info.assert_any_call("Rate limited by the API. Retrying in 0 seconds...")
+
+
+def test_request_stops_at_deadline():
+    """Should not send requests once the deploy deadline has passed."""
+    client = make_client([], deadline=Deadline(0))
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(client.get_webapps())
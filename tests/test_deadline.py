@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import patch
+from src.deadline import Deadline, DeadlineExceeded
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unlimited_deadline_never_expires():
+    """Should report no remaining limit when no budget is given."""
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert deadline.timeout(30) == 30
+    deadline.check()
+
+
+def test_timeout_is_capped_by_remaining_budget():
+    """Should never return a timeout larger than the remaining time."""
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+    clock.now = 8
+    assert deadline.timeout(30) == 2
+
+
+def test_phase_budget_reports_overrunning_phase():
+    """Should raise DeadlineExceeded naming the phase whose budget ran out."""
+    clock = FakeClock()
+    deadline = Deadline(100, {"git_pull": 5}, clock=clock)
+
+    with deadline.phase("git_pull"):
+        clock.now = 6
+        with pytest.raises(DeadlineExceeded, match="phase 'git_pull' \\(budget 5s"):
+            deadline.check()
+
+    # The total budget still applies once the phase is over
+    deadline.check()
+    assert deadline.remaining() == 94
+
+
+def test_total_budget_reports_current_phase():
+    """Should name the running phase when the overall deadline is reached."""
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        with deadline.phase("framework"):
+            clock.now = 11
+            deadline.check()
+
+    assert exc_info.value.phase == "framework"
+    assert exc_info.value.budget == 10
+
+
+@patch("time.sleep")
+def test_sleep_never_exceeds_remaining_budget(mock_sleep):
+    """Should shorten the sleep to the remaining time."""
+    clock = FakeClock()
+    deadline = Deadline(3, clock=clock)
+    mock_sleep.side_effect = lambda seconds: setattr(clock, "now", clock.now + seconds)
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.sleep(5)
+
+    mock_sleep.assert_called_once_with(3)
+
+
+def test_parse_phase_budgets():
+    """Should parse PHASE=SECONDS lines, ignoring blanks and comments."""
+    budgets = Deadline.parse_phase_budgets("git_pull=120\n\n# comment\nFramework = 300")
+    assert budgets == {"git_pull": 120.0, "framework": 300.0}
+
+    with pytest.raises(ValueError, match="Expected PHASE=SECONDS"):
+        Deadline.parse_phase_budgets("git_pull")
+
+
+def test_parse_phase_budgets_rejects_unknown_phase():
+    """Should reject phase names that are not part of the deploy."""
+    with pytest.raises(ValueError, match="Unknown phase 'gitpull'"):
+        Deadline.parse_phase_budgets("gitpull=120")
+
+
+@pytest.mark.parametrize("value", ["0", "-5", "nan", "inf"])
+def test_parse_phase_budgets_rejects_non_positive_budgets(value):
+    """Should reject budgets that are not finite positive numbers."""
+    with pytest.raises(ValueError, match="Invalid timeout for phase 'git_pull'"):
+        Deadline.parse_phase_budgets(f"git_pull={value}")
+
+
+def test_parse_total_names_the_input():
+    """Should parse the deploy timeout and name the input when it is invalid."""
+    assert Deadline.parse_total("600") == 600
+    assert Deadline.parse_total("") is None
+
+    with pytest.raises(ValueError, match="Invalid 'deploy_timeout' input: '10m'"):
+        Deadline.parse_total("10m")
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "nan", "inf"])
+def test_parse_total_rejects_non_positive_values(value):
+    """Should reject deploy timeouts that are not finite positive numbers."""
+    with pytest.raises(ValueError, match="Expected a positive number of seconds"):
+        Deadline.parse_total(value)
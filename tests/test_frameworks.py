@@ -1,11 +1,15 @@
+import json
+import re
 import pytest
 from unittest.mock import Mock, patch
 from src.frameworks import (
+    DeclarativeFramework,
     DjangoFramework,
     FlaskFramework,
     FrameworkFactory,
 )
 from src.pa_utils import PythonAnywhereUtils
+from src.metadata_cache import MetadataCache
 
 
 @pytest.fixture
@@ -76,3 +80,259 @@ def test_factory_invalid_type(mock_client, web_app):
     """Should raise ValueError for unsupported framework types."""
     with pytest.raises(ValueError, match="not supported"):
         FrameworkFactory.create("unknown", mock_client, 1, web_app)
+
+
+def test_factory_ignores_options_of_other_frameworks(mock_client, web_app):
+    """Should create a Flask framework even when Django options are passed."""
+    framework = FrameworkFactory.create("flask", mock_client, 1, web_app, django_settings=None)
+    assert isinstance(framework, FlaskFramework)
+
+
+@patch("src.frameworks.info")
+def test_flask_uses_cached_alembic_path(mock_info, mock_client, web_app, tmp_path):
+    """Should skip the alembic.ini search when its path is cached."""
+    with patch("src.metadata_cache.info"):
+        cache = MetadataCache(str(tmp_path / "cache.json"))
+    cache.set("alembic_paths", {web_app["source_directory"]: "/home/user/myapp/migrations/alembic.ini"})
+
+    FlaskFramework(mock_client, 1, web_app, cache=cache).run_commands()
+
+    calls = [call.args[1] for call in mock_client.send_input_to_console.call_args_list]
+    assert not any(cmd.startswith("find ") for cmd in calls)
+    assert "cd /home/user/myapp/migrations && alembic upgrade head" in calls
+
+
+@patch("src.frameworks.info")
+@patch.object(PythonAnywhereUtils, "parse_and_check_alembic", return_value=(True, "/home/user/myapp/alembic.ini"))
+def test_flask_caches_found_alembic_path(mock_parse, mock_info, mock_client, web_app, tmp_path):
+    """Should store the discovered alembic.ini path in the cache."""
+    with patch("src.metadata_cache.info"):
+        cache = MetadataCache(str(tmp_path / "cache.json"))
+
+    FlaskFramework(mock_client, 1, web_app, cache=cache).run_commands()
+
+    assert cache.get("alembic_paths") == {web_app["source_directory"]: "/home/user/myapp/alembic.ini"}
+
+
+def write_definition(tmp_path, definition):
+    path = tmp_path / "framework.json"
+    path.write_text(json.dumps(definition))
+    return str(path)
+
+
+FASTAPI_DEFINITION = {
+    "name": "FastAPI",
+    "steps": [
+        {
+            "name": "Install",
+            "command": "pip install -r {source_directory}/requirements.txt",
+            "skip_unless_hash_changed": ["requirements.txt"],
+        },
+        {
+            "name": "Migrate",
+            "command": "cd {source_directory} && alembic upgrade head",
+            "skip_unless_changed": ["migrations/*"],
+            "fail_on": ["FAILED"],
+        },
+        {"name": "Touch", "command": "touch ${HOME}/{domain_name}.stamp"},
+    ],
+}
+
+
+@pytest.fixture
+def registry():
+    """Restores the framework registry after a test registers definitions."""
+    with patch.dict(FrameworkFactory._registry):
+        yield FrameworkFactory._registry
+
+
+@patch("src.frameworks.info")
+def test_load_definition_registers_framework(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should register a declarative framework created through the factory."""
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+
+    framework = FrameworkFactory.create(name, mock_client, 1, web_app, django_settings=None)
+    assert name == "fastapi"
+    assert isinstance(framework, DeclarativeFramework)
+
+
+@patch("src.frameworks.info")
+def test_load_definition_rejects_invalid_steps(mock_info, registry, tmp_path):
+    """Should raise ValueError for steps without a command."""
+    path = write_definition(tmp_path, {"name": "broken", "steps": [{"name": "No command"}]})
+
+    with pytest.raises(ValueError, match="needs a 'name' and a 'command'"):
+        FrameworkFactory.load_definition(path)
+
+
+def fake_console(client, outputs=None, incomplete_reads=None, exit_statuses=None):
+    """
+    Answers the marked commands sent to the console like a real console would.
+    `outputs`, `incomplete_reads` and `exit_statuses` map command fragments to their
+    output lines, how many reads happen before they finish and their exit status.
+    Returns the list of commands sent, without their markers.
+    """
+    outputs, incomplete_reads, exit_statuses = outputs or {}, incomplete_reads or {}, exit_statuses or {}
+    commands, current = [], {}
+
+    def send(console_id, command, success_msg):
+        match = re.match(r"echo '(\S+)-begin'; (.*); echo '\S+-end:'\$\?$", command)
+        marker, command = match.groups() if match else (None, command)
+        commands.append(command)
+        current.update(marker=marker, command=command, reads=0)
+
+    def read(console_id, success_msg):
+        command = current["command"]
+        lines = next((lines for fragment, lines in outputs.items() if fragment in command), ["OK"])
+        if current["marker"] is None:
+            return {"output": "\n".join(lines)}
+        current["reads"] += 1
+        pending = next((count for fragment, count in incomplete_reads.items() if fragment in command), 0)
+        block = [f"{current['marker']}-begin", *lines]
+        if current["reads"] <= pending:
+            return {"output": "\n".join(block[:2])}
+        status = next((code for fragment, code in exit_statuses.items() if fragment in command), 0)
+        return {"output": "\n".join([f"$ {command}", *block, f"{current['marker']}-end:{status}", "$ "])}
+
+    client.send_input_to_console.side_effect = send
+    client.get_latest_console_output.side_effect = read
+    return commands
+
+
+OLD_COMMIT, NEW_COMMIT = "a" * 40, "b" * 40
+
+
+def cache_with_deploy_state(tmp_path, web_app):
+    with patch("src.metadata_cache.info"):
+        cache = MetadataCache(str(tmp_path / "cache.json"))
+    cache.set("deploy_state", {web_app["source_directory"]: {"commit": OLD_COMMIT, "hashes": {"requirements.txt": "aaa"}}})
+    return cache
+
+
+@patch("src.frameworks.info")
+def test_load_definition_rejects_registered_names(mock_info, registry, tmp_path):
+    """Should not let a definition replace a built-in framework."""
+    path = write_definition(tmp_path, dict(FASTAPI_DEFINITION, name="Django"))
+
+    with pytest.raises(ValueError, match="framework 'django' is already registered"):
+        FrameworkFactory.load_definition(path)
+    assert registry["django"] is DjangoFramework
+
+
+@patch("src.frameworks.info")
+def test_declarative_runs_every_step_without_cache(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should run every step, filling the placeholders, when there is no cache."""
+    commands = fake_console(mock_client)
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+    FrameworkFactory.create(name, mock_client, 1, dict(web_app, domain_name="app.com")).run_commands()
+
+    assert commands == [
+        "source /home/user/.virtualenvs/myapp/bin/activate",
+        "pip install -r /home/user/myapp/requirements.txt",
+        "cd /home/user/myapp && alembic upgrade head",
+        "touch ${HOME}/app.com.stamp",
+    ]
+
+
+@patch("src.frameworks.info")
+def test_declarative_skips_unchanged_steps(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should skip steps whose paths and hashes did not change since the last deploy."""
+    cache = cache_with_deploy_state(tmp_path, web_app)
+    commands = fake_console(mock_client, {
+        "rev-parse": [f"commit:{NEW_COMMIT}", "changed:app/main.py", "hash:aaa  requirements.txt"],
+    })
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+    FrameworkFactory.create(name, mock_client, 1, web_app, cache=cache).run_commands()
+
+    assert not any("pip install" in cmd or "alembic" in cmd for cmd in commands)
+    assert any(cmd.startswith("touch ") for cmd in commands)
+    assert any(f"git -C /home/user/myapp diff --name-only --relative {OLD_COMMIT} HEAD" in cmd for cmd in commands)
+    mock_info.assert_any_call("Skipping step 'Install': no relevant changes since the last deploy.")
+    assert cache.get("deploy_state")[web_app["source_directory"]]["commit"] == NEW_COMMIT
+
+
+@patch("src.frameworks.info")
+def test_declarative_runs_changed_steps_and_checks_output(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should run steps whose inputs changed and fail on a matching output check."""
+    cache = cache_with_deploy_state(tmp_path, web_app)
+    commands = fake_console(mock_client, {
+        "rev-parse": [f"commit:{NEW_COMMIT}", "changed:migrations/001.py", "hash:bbb  requirements.txt"],
+        "alembic": ["alembic upgrade FAILED"],
+    })
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+    framework = FrameworkFactory.create(name, mock_client, 1, web_app, cache=cache)
+
+    with pytest.raises(Exception, match="Step 'Migrate' failed: found 'FAILED'"):
+        framework.run_commands()
+
+    assert "pip install -r /home/user/myapp/requirements.txt" in commands
+    assert cache.get("deploy_state")[web_app["source_directory"]]["commit"] == OLD_COMMIT
+    mock_client.get_consoles.assert_not_called()
+
+
+@patch("src.frameworks.info")
+def test_declarative_waits_for_step_to_finish(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should keep polling while the end marker is missing and check only the finished output."""
+    definition = {"name": "slow", "steps": [
+        {"name": "Migrate", "command": "alembic upgrade head", "fail_on": ["FAILED"]},
+        {"name": "Touch", "command": "touch done"},
+    ]}
+    commands = fake_console(
+        mock_client,
+        {"alembic": ["Running upgrade", "alembic upgrade FAILED"]},
+        {"alembic": 2}
+    )
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, definition))
+    with pytest.raises(Exception, match="Step 'Migrate' failed: found 'FAILED'"):
+        FrameworkFactory.create(name, mock_client, 1, web_app).run_commands()
+
+    assert mock_client.get_latest_console_output.call_count == 3
+    assert [call.args[0] for call in mock_client.deadline.sleep.call_args_list] == [1, 2]
+    assert "touch done" not in commands
+
+
+@patch("src.frameworks.info")
+@patch("src.frameworks.time.monotonic", side_effect=[0, 1, 700])
+def test_declarative_step_timeout(mock_monotonic, mock_info, registry, mock_client, web_app, tmp_path):
+    """Should fail a step whose end marker does not appear within its timeout."""
+    definition = {"name": "stuck", "activate_venv": False, "steps": [{"name": "Serve", "command": "python serve.py"}]}
+    fake_console(mock_client, incomplete_reads={"serve": 10})
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, definition))
+    with pytest.raises(Exception, match="Step 'Serve' did not finish within 600 seconds"):
+        FrameworkFactory.create(name, mock_client, 1, web_app).run_commands()
+
+
+@patch("src.frameworks.info")
+def test_declarative_failed_step_is_not_recorded(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should fail on a non-zero exit status and keep the previous deploy state, so the step runs again."""
+    cache = cache_with_deploy_state(tmp_path, web_app)
+    commands = fake_console(
+        mock_client,
+        {"rev-parse": [f"commit:{NEW_COMMIT}", "changed:app/main.py", "hash:bbb  requirements.txt"]},
+        exit_statuses={"pip install": 1}
+    )
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+    with pytest.raises(Exception, match="Step 'Install' failed with exit status 1"):
+        FrameworkFactory.create(name, mock_client, 1, web_app, cache=cache).run_commands()
+
+    assert not any(cmd.startswith("touch ") for cmd in commands)
+    assert cache.get("deploy_state")[web_app["source_directory"]] == {"commit": OLD_COMMIT, "hashes": {"requirements.txt": "aaa"}}
+
+
+@patch("src.frameworks.info")
+def test_declarative_ignores_tampered_cached_commit(mock_info, registry, mock_client, web_app, tmp_path):
+    """Should never put a cached commit that is not a plain hash into a console command."""
+    cache = cache_with_deploy_state(tmp_path, web_app)
+    cache.set("deploy_state", {web_app["source_directory"]: {"commit": "HEAD; rm -rf ~", "hashes": {}}})
+    commands = fake_console(mock_client, {"rev-parse": [f"commit:{NEW_COMMIT}"]})
+
+    name = FrameworkFactory.load_definition(write_definition(tmp_path, FASTAPI_DEFINITION))
+    FrameworkFactory.create(name, mock_client, 1, web_app, cache=cache).run_commands()
+
+    assert not any("rm -rf" in cmd for cmd in commands)
+    assert any("alembic upgrade head" in cmd for cmd in commands)
@@ -0,0 +1,121 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.metadata_cache import MetadataCache
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@patch("src.metadata_cache.info")
+def test_save_and_load_round_trip(mock_info, tmp_path):
+    """Should restore saved entries as unconfirmed."""
+    path = str(tmp_path / "cache.json")
+    cache = MetadataCache(path, key="host/user")
+    cache.set("console", {"id": 7, "executable": "bash"})
+    assert not cache.unconfirmed("console")
+    cache.save()
+
+    restored = MetadataCache(path, key="host/user")
+    assert restored.get("console") == {"id": 7, "executable": "bash"}
+    assert restored.unconfirmed("console")
+
+    restored.confirm("console")
+    assert not restored.unconfirmed("console")
+
+
+@patch("src.metadata_cache.info")
+def test_expired_cache_is_ignored(mock_info, tmp_path):
+    """Should ignore a cache older than the TTL."""
+    path = str(tmp_path / "cache.json")
+    clock = FakeClock()
+    cache = MetadataCache(path, ttl=60, key="host/user", clock=clock)
+    cache.set("console", {"id": 7})
+    cache.save()
+
+    clock.now += 61
+    assert MetadataCache(path, ttl=60, key="host/user", clock=clock).get("console") is None
+    mock_info.assert_any_call("Discovery cache entries expired: console.")
+
+
+@patch("src.metadata_cache.info")
+def test_cache_of_other_account_is_ignored(mock_info, tmp_path):
+    """Should not reuse metadata saved for another host or username."""
+    path = str(tmp_path / "cache.json")
+    cache = MetadataCache(path, key="host/alice")
+    cache.set("console", {"id": 7})
+    cache.save()
+
+    assert MetadataCache(path, key="host/bob").get("console") is None
+
+
+@patch("src.metadata_cache.info")
+def test_corrupt_cache_is_ignored(mock_info, tmp_path):
+    """Should start empty when the cache file is not valid JSON."""
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+
+    assert MetadataCache(str(path)).entries == {}
+
+
+@patch("src.metadata_cache.info")
+def test_clear_removes_file(mock_info, tmp_path):
+    """Should delete the cache file and every entry."""
+    path = tmp_path / "cache.json"
+    cache = MetadataCache(str(path))
+    cache.set("webapps", [{"domain_name": "app.pythonanywhere.com"}])
+    cache.save()
+    assert json.loads(path.read_text())["entries"]["webapps"]
+
+    cache.clear()
+    assert not path.exists()
+    assert cache.get("webapps") is None
+
+
+@patch("src.metadata_cache.info")
+def test_resaving_does_not_extend_expiry(mock_info, tmp_path):
+    """Should expire entries by their live discovery time, however often the file is saved."""
+    path = str(tmp_path / "cache.json")
+    clock = FakeClock(0)
+
+    def next_run(now):
+        clock.now = now
+        return MetadataCache(path, ttl=100, key="host/user", clock=clock)
+
+    cache = next_run(0)
+    cache.set("webapps", [{"domain_name": "app.com", "virtualenv_path": "/old"}])
+    cache.save()
+
+    # A successful run reuses the cached records, discovers the console live and saves
+    cache = next_run(90)
+    assert cache.get("webapps")[0]["virtualenv_path"] == "/old"
+    assert cache.unconfirmed("webapps")
+    cache.set("console", {"id": 1})
+    cache.save()
+
+    # Later runs drop each entry once it is older than the TTL
+    cache = next_run(180)
+    assert cache.get("webapps") is None
+    assert cache.get("console") == {"id": 1}
+    cache.save()
+
+    assert next_run(270).get("console") is None
+
+
+def test_parse_ttl_names_the_input():
+    """Should parse the cache TTL and name the input when it is invalid."""
+    assert MetadataCache.parse_ttl("3600") == 3600
+    assert MetadataCache.parse_ttl("") == MetadataCache.DEFAULT_TTL
+
+    with pytest.raises(ValueError, match="Invalid 'cache_ttl' input: '1d'. Expected a number of seconds."):
+        MetadataCache.parse_ttl("1d")
+    for value in ("0", "-60", "nan"):
+        with pytest.raises(ValueError, match="Expected a positive number of seconds"):
+            MetadataCache.parse_ttl(value)
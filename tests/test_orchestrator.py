@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from src.deadline import Deadline, DeadlineExceeded
+from src.orchestrator import DeployOrchestrator
+from src.transport import TransportResponse
+
+
+class StringContaining(str):
+    """Matches any string containing the given text in mock assertions."""
+
+    def __eq__(self, other):
+        return isinstance(other, str) and str(self) in other
+
+    __hash__ = str.__hash__
+
+
+@pytest.fixture
+def mock_client():
+    """Creates a mock AsyncPythonAnywhereClient."""
+    client = Mock()
+    client.deadline = Deadline()
+    client.reload_webapp = AsyncMock()
+    client.get_always_on_tasks = AsyncMock(return_value=[])
+    client.restart_always_on_task = AsyncMock()
+    client.close = AsyncMock()
+    client.transport = Mock()
+    client.transport.request = AsyncMock(return_value=TransportResponse(200, b"OK"))
+    return client
+
+
+@patch("src.orchestrator.info")
+def test_finalize_reloads_webapps_concurrently(mock_info, mock_client):
+    """Should reload every web app on the same event loop, overlapping the waits."""
+    in_flight = []
+    max_in_flight = []
+
+    async def slow_reload(domain_name):
+        in_flight.append(domain_name)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(domain_name)
+
+    mock_client.reload_webapp.side_effect = slow_reload
+    domains = ["a.pythonanywhere.com", "b.pythonanywhere.com", "c.pythonanywhere.com"]
+
+    timings = asyncio.run(DeployOrchestrator(mock_client).finalize(domains))
+
+    assert set(timings["webapps"]) == set(domains)
+    assert max(max_in_flight) == 3
+    mock_client.transport.request.assert_not_called()
+
+
+@patch("src.orchestrator.info")
+def test_finalize_warms_up_after_reload(mock_info, mock_client):
+    """Should send a warm-up request to each reloaded web app."""
+    timings = asyncio.run(DeployOrchestrator(mock_client).finalize(["a.pythonanywhere.com"], warm_up=True))
+
+    assert set(timings["webapps"]["a.pythonanywhere.com"]) == {"reload", "warm_up"}
+    assert mock_client.transport.request.call_args.args == ("GET", "https://a.pythonanywhere.com/")
+
+
+@patch("src.orchestrator.info")
+def test_finalize_reports_every_failure(mock_info, mock_client):
+    """Should let every web app finish and then report the failed ones."""
+    async def reload(domain_name):
+        if domain_name.startswith("bad"):
+            raise Exception("API Error: 404")
+
+    mock_client.reload_webapp.side_effect = reload
+
+    with pytest.raises(Exception, match="bad.pythonanywhere.com: API Error: 404"):
+        asyncio.run(DeployOrchestrator(mock_client).finalize(["good.pythonanywhere.com", "bad.pythonanywhere.com"]))
+
+    assert mock_client.reload_webapp.await_count == 2
+
+
+@patch("src.orchestrator.info")
+def test_warm_up_server_error_fails(mock_info, mock_client):
+    """Should fail when the warm-up request gets a server error."""
+    mock_client.transport.request.return_value = TransportResponse(502, b"Bad Gateway")
+
+    with pytest.raises(Exception, match="failed with status 502"):
+        asyncio.run(DeployOrchestrator(mock_client).finalize(["a.pythonanywhere.com"], warm_up=True))
+
+
+@patch("src.orchestrator.info")
+def test_finalize_restarts_matching_tasks_alongside_reload(mock_info, mock_client):
+    """Should restart the enabled matching always-on tasks while the web app reloads."""
+    reload_started = asyncio.Event()
+    restarted_during_reload = []
+
+    async def slow_reload(domain_name):
+        reload_started.set()
+        await asyncio.sleep(0.01)
+
+    async def restart(task_id):
+        restarted_during_reload.append(reload_started.is_set())
+
+    mock_client.reload_webapp.side_effect = slow_reload
+    mock_client.restart_always_on_task.side_effect = restart
+    mock_client.get_always_on_tasks.return_value = [
+        {"id": 1, "command": "/home/u/.virtualenvs/x/bin/celery -A app worker", "description": "", "enabled": True},
+        {"id": 2, "command": "python bot.py", "description": "celery beat", "enabled": True},
+        {"id": 3, "command": "celery -A app flower", "description": "", "enabled": False},
+        {"id": 4, "command": "python other.py", "description": "", "enabled": True},
+        {"id": 5, "command": "python worker.py --queue celery", "description": "", "enabled": True},
+    ]
+
+    timings = asyncio.run(DeployOrchestrator(mock_client).finalize(
+        ["a.pythonanywhere.com"], task_patterns=["*celery*"]
+    ))
+
+    assert set(timings["always_on_tasks"]) == {1, 2, 5}
+    assert restarted_during_reload == [True, True, True]
+    mock_info.assert_any_call(StringContaining("Always-on task 1 (/home/u/.virtualenvs/x/bin/celery -A app worker) restarted in"))
+
+
+@patch("src.orchestrator.info")
+def test_finalize_reports_task_failures(mock_info, mock_client):
+    """Should report failed task restarts together with the web app results."""
+    mock_client.get_always_on_tasks.return_value = [{"id": 7, "command": "worker.py", "enabled": True}]
+    mock_client.restart_always_on_task.side_effect = Exception("API Error: 429 - Too many requests")
+
+    with pytest.raises(Exception, match="always-on task 7: API Error: 429"):
+        asyncio.run(DeployOrchestrator(mock_client).finalize(["a.pythonanywhere.com"], task_patterns=["worker*"]))
+
+    mock_client.reload_webapp.assert_awaited_once()
+
+
+def test_finalize_propagates_deadline(mock_client):
+    """Should surface the deadline error instead of a generic failure."""
+    mock_client.reload_webapp.side_effect = DeadlineExceeded("reload", 5, 6)
+
+    with pytest.raises(DeadlineExceeded, match="phase 'reload'"):
+        asyncio.run(DeployOrchestrator(mock_client).finalize(["a.pythonanywhere.com"]))
+
+
+@patch("src.orchestrator.info")
+def test_run_closes_client(mock_info, mock_client):
+    """Should close the client connections once the event loop is done."""
+    DeployOrchestrator.run(mock_client, ["a.pythonanywhere.com"])
+    mock_client.close.assert_awaited_once()
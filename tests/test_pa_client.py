@@ -3,6 +3,7 @@ import requests
 import requests_mock
 from unittest.mock import patch
 from src.pa_client import PythonAnywhereClient
+from src.deadline import Deadline, DeadlineExceeded
 
 
 @pytest.fixture
@@ -67,3 +68,27 @@ def test_send_input_to_console(mock_info, client):
         client.send_input_to_console(console_id, "ls -la", "Done")
         mock_info.assert_any_call("Running command: ls -la")
         mock_info.assert_any_call("Done")
+
+
+@patch("src.pa_client.info")
+def test_get_latest_console_output_stops_at_deadline(mock_info):
+    """Should abort retries instead of sleeping past the deploy deadline."""
+    client = PythonAnywhereClient("testuser", "testtoken", "www.pythonanywhere.com", deadline=Deadline(0))
+
+    with pytest.raises(DeadlineExceeded):
+        client.get_latest_console_output(42, "Success")
+
+
+@patch("src.pa_client.info")
+def test_rate_limited_request_is_retried(mock_info, client):
+    """Should wait for the Retry-After delay and retry a 429 response."""
+    with patch("time.sleep", return_value=None):
+        with requests_mock.Mocker() as m:
+            url = f"{client.base_api_url}/webapps/"
+            m.get(url, [
+                {"status_code": 429, "headers": {"Retry-After": "2"}},
+                {"json": [{"domain_name": "app.com"}], "status_code": 200},
+            ])
+
+            assert client.get_webapps() == [{"domain_name": "app.com"}]
+            mock_info.assert_any_call("Rate limited by the API. Retrying in 2 seconds...")
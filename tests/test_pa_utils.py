@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import Mock, patch
 from src.pa_utils import PythonAnywhereUtils
+from src.metadata_cache import MetadataCache
+from src.pa_client import APIError
 
 
 @pytest.fixture
@@ -143,3 +145,145 @@ def test_parse_and_check_alembic_not_found(mock_info):
     assert exists is False
     assert path is None
     mock_info.assert_any_call("Alembic configuration not found, skipping migrations.")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Creates an empty discovery cache backed by a temporary file."""
+    with patch("src.metadata_cache.info"):
+        return MetadataCache(str(tmp_path / "cache.json"), key="host/user")
+
+
+@patch("src.pa_utils.info")
+def test_setup_console_uses_cache(mock_info, mock_client, cache):
+    """Should skip the consoles request when a console is cached."""
+    cache.set("console", {"id": 5, "executable": "bash"})
+
+    console = PythonAnywhereUtils.setup_console(mock_client, cache)
+
+    assert console["id"] == 5
+    mock_client.get_consoles.assert_not_called()
+
+
+@patch("src.pa_utils.info")
+def test_setup_console_stores_live_result(mock_info, mock_client, cache):
+    """Should store the discovered console in the cache."""
+    mock_client.get_consoles.return_value = [{"id": 1, "executable": "bash"}]
+
+    PythonAnywhereUtils.setup_console(mock_client, cache)
+
+    assert cache.get("console") == {"id": 1, "executable": "bash"}
+
+
+@patch("src.pa_utils.info")
+def test_setup_web_app_falls_back_when_domain_not_cached(mock_info, mock_client, cache):
+    """Should run live discovery when the cached records lack the requested domain."""
+    cache.set("webapps", [{"domain_name": "old.pythonanywhere.com"}])
+    mock_client.get_webapps.return_value = [{"domain_name": "new.pythonanywhere.com"}]
+
+    app = PythonAnywhereUtils.setup_web_app(mock_client, "new.pythonanywhere.com", cache)
+
+    assert app["domain_name"] == "new.pythonanywhere.com"
+    assert cache.get("webapps") == [{"domain_name": "new.pythonanywhere.com"}]
+
+
+def reload_cache(cache):
+    """Saves and reloads the cache, so its entries are unconfirmed like on a new run."""
+    cache.save()
+    with patch("src.metadata_cache.info"):
+        return MetadataCache(cache.path, key=cache.key)
+
+
+@patch("src.pa_utils.info")
+def test_setup_web_app_confirms_cached_record(mock_info, mock_client, cache):
+    """Should use a cached web app once the live record confirms its paths."""
+    app = {"domain_name": "app.com", "source_directory": "/home/u/app", "virtualenv_path": "/home/u/.virtualenvs/app"}
+    cache.set("webapps", [app])
+    cache = reload_cache(cache)
+    mock_client.get_webapp.return_value = dict(app, python_version="3.10")
+
+    assert PythonAnywhereUtils.setup_web_app(mock_client, "app.com", cache) == app
+    mock_client.get_webapp.assert_called_once_with("app.com")
+    mock_client.get_webapps.assert_not_called()
+    assert not cache.unconfirmed("webapps")
+
+
+@patch("src.pa_utils.info")
+def test_setup_web_app_rediscovers_stale_cached_record(mock_info, mock_client, cache):
+    """Should rediscover the web apps when the cached paths no longer match."""
+    old_app = {"domain_name": "app.com", "source_directory": "/home/u/old", "virtualenv_path": "/home/u/.virtualenvs/app"}
+    new_app = dict(old_app, source_directory="/home/u/app")
+    cache.set("webapps", [old_app])
+    cache = reload_cache(cache)
+    mock_client.get_webapp.return_value = new_app
+    mock_client.get_webapps.return_value = [new_app]
+
+    assert PythonAnywhereUtils.setup_web_app(mock_client, "app.com", cache) == new_app
+    assert cache.get("webapps") == [new_app]
+    assert not cache.unconfirmed("webapps")
+
+
+@patch("src.pa_utils.info")
+def test_run_on_console_rediscovers_stale_cached_console(mock_info, mock_client, cache):
+    """Should rediscover the console and retry when the cached one fails."""
+    cache.set("console", {"id": 5, "executable": "bash"})
+    cache.save()
+    with patch("src.metadata_cache.info"):
+        cache = MetadataCache(cache.path, key=cache.key)
+    mock_client.get_consoles.return_value = [{"id": 9, "executable": "bash"}]
+    used_ids = []
+
+    def action(console_id):
+        used_ids.append(console_id)
+        if console_id == 5:
+            raise APIError("API Error: 404 - Not found", 404)
+
+    console = PythonAnywhereUtils.run_on_console(mock_client, {"id": 5}, action, cache)
+
+    assert console["id"] == 9
+    assert used_ids == [5, 9]
+    assert cache.get("console")["id"] == 9
+    assert not cache.unconfirmed("console")
+
+
+@patch("src.pa_utils.info")
+def test_run_on_console_does_not_retry_cached_console_on_network_error(mock_info, mock_client, cache):
+    """Should not re-run a command that may already have been sent to the cached console."""
+    cache.set("console", {"id": 5, "executable": "bash"})
+    cache.save()
+    with patch("src.metadata_cache.info"):
+        cache = MetadataCache(cache.path, key=cache.key)
+    calls = []
+
+    def action(console_id):
+        calls.append(console_id)
+        raise Exception("Request to console failed: request timed out")
+
+    with pytest.raises(Exception, match="timed out"):
+        PythonAnywhereUtils.run_on_console(mock_client, {"id": 5}, action, cache)
+
+    assert calls == [5]
+    mock_client.get_consoles.assert_not_called()
+
+
+def test_run_on_console_does_not_retry_live_console(mock_client, cache):
+    """Should propagate failures of a console that was discovered live."""
+    def action(console_id):
+        raise Exception("boom")
+
+    with pytest.raises(Exception, match="boom"):
+        PythonAnywhereUtils.run_on_console(mock_client, {"id": 1}, action, cache)
+    mock_client.get_consoles.assert_not_called()
+
+
+def test_extract_marked_output_returns_last_block():
+    """Should return the lines and exit status of the last complete marked block, ignoring the echoed command."""
+    response = {"output": (
+        "$ echo 'm-begin'; git rev-parse HEAD; echo 'm-end:'$?\n"
+        "m-begin\nold\nm-end:0\n"
+        "m-begin\ncommit:abc\n\nchanged:app.py\nm-end:2\n$ "
+    )}
+
+    assert PythonAnywhereUtils.extract_marked_output(response, "m") == (["commit:abc", "changed:app.py"], 2)
+    assert PythonAnywhereUtils.extract_marked_output({"output": "m-begin\nstill running"}, "m") is None
+    assert PythonAnywhereUtils.extract_marked_output({"output": "truncated\nm-end:0"}, "m") == (["truncated"], 0)
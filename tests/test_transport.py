@@ -0,0 +1,167 @@
+import asyncio
+import http.client
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, Mock, patch
+from src.transport import StdlibTransport, AsyncStdlibTransport, RequestsTransport, create_transport
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Answers every request with its method, path, body and client port."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode() if length else None
+        status = 400 if self.path.startswith("/error") else 200
+        payload = json.dumps({
+            "method": self.command,
+            "path": self.path,
+            "body": json.loads(body) if body else None,
+            "client_port": self.client_address[1],
+        }).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    """Starts a local HTTP/1.1 server for the duration of a test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_stdlib_transport_sends_json_and_keeps_connection_alive(server_url):
+    """Should send JSON bodies and reuse the same connection across requests."""
+    transport = StdlibTransport()
+    try:
+        first = transport.request("POST", f"{server_url}/consoles/1/send_input/", json_data={"input": "ls\n"}, timeout=5)
+        second = transport.request("GET", f"{server_url}/consoles/?page=1", timeout=5)
+    finally:
+        transport.close()
+
+    assert first.status_code == 200
+    assert first.json()["body"] == {"input": "ls\n"}
+    assert second.json()["path"] == "/consoles/?page=1"
+    assert first.json()["client_port"] == second.json()["client_port"]
+
+
+def test_stdlib_transport_returns_error_responses(server_url):
+    """Should return error statuses to the caller instead of raising."""
+    transport = StdlibTransport()
+    response = transport.request("GET", f"{server_url}/error/", timeout=5)
+    transport.close()
+
+    assert response.status_code == 400
+    assert response.json()["method"] == "GET"
+
+
+def test_async_stdlib_transport_pools_connections(server_url):
+    """Should reuse idle connections and open new ones for concurrent requests."""
+    async def scenario():
+        transport = AsyncStdlibTransport()
+        try:
+            first = await transport.request("POST", f"{server_url}/webapps/a/reload/", json_data={}, timeout=5)
+            second = await transport.request("GET", f"{server_url}/webapps/", timeout=5)
+            concurrent = await asyncio.gather(
+                transport.request("GET", f"{server_url}/one/", timeout=5),
+                transport.request("GET", f"{server_url}/two/", timeout=5),
+            )
+        finally:
+            await transport.close()
+        return first, second, concurrent
+
+    first, second, concurrent = asyncio.run(scenario())
+
+    assert first.json()["method"] == "POST"
+    assert first.json()["client_port"] == second.json()["client_port"]
+    assert [r.json()["path"] for r in concurrent] == ["/one/", "/two/"]
+    assert concurrent[0].json()["client_port"] != concurrent[1].json()["client_port"]
+
+
+def test_create_transport_by_name():
+    """Should create the requested backend and reject unknown names."""
+    assert isinstance(create_transport("stdlib"), StdlibTransport)
+    assert isinstance(create_transport("requests"), RequestsTransport)
+
+    with pytest.raises(ValueError, match="not supported"):
+        create_transport("curl")
+
+
+@patch.object(RequestsTransport, "__init__", side_effect=ImportError)
+def test_create_transport_auto_falls_back_to_stdlib(mock_init):
+    """Should use the stdlib backend when requests is not installed."""
+    assert isinstance(create_transport("auto"), StdlibTransport)
+
+
+def stale_connection():
+    """Kept-alive connection whose server closed it without answering."""
+    conn = Mock()
+    conn.sock = None
+    conn.getresponse.side_effect = http.client.RemoteDisconnected("closed")
+    return conn
+
+
+def test_stdlib_transport_retries_idempotent_request_on_stale_connection(server_url):
+    """Should re-send a GET on a fresh connection when the kept-alive one was closed."""
+    transport = StdlibTransport()
+    netloc = server_url.split("//", 1)[1]
+    transport._connections[("http", netloc)] = stale_connection()
+
+    response = transport.request("GET", f"{server_url}/consoles/", timeout=5)
+    transport.close()
+
+    assert response.json()["method"] == "GET"
+
+
+def test_stdlib_transport_does_not_resend_post_after_disconnect(server_url):
+    """Should not re-send a POST the server may already have processed."""
+    transport = StdlibTransport()
+    netloc = server_url.split("//", 1)[1]
+    transport._connections[("http", netloc)] = stale_connection()
+
+    with pytest.raises(http.client.RemoteDisconnected):
+        transport.request("POST", f"{server_url}/consoles/1/send_input/", json_data={"input": "ls\n"}, timeout=5)
+
+
+def stale_async_connection():
+    """Kept-alive stream pair whose server closes it after receiving the request."""
+    reader = Mock()
+    reader.at_eof.return_value = False
+    reader.readline = AsyncMock(return_value=b"")
+    writer = Mock()
+    writer.drain = AsyncMock()
+    return reader, writer
+
+
+def test_async_stdlib_transport_resend_policy(server_url):
+    """Should re-send a GET but not a POST after the kept-alive connection drops."""
+    netloc = server_url.split("//", 1)[1]
+
+    async def scenario(method):
+        transport = AsyncStdlibTransport()
+        transport._idle[("http", netloc)] = [stale_async_connection()]
+        try:
+            return await transport.request(method, f"{server_url}/consoles/", json_data={}, timeout=5)
+        finally:
+            await transport.close()
+
+    assert asyncio.run(scenario("GET")).json()["method"] == "GET"
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(scenario("POST"))